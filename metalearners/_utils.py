@@ -325,8 +325,7 @@ def clip_element_absolute_value_to_epsilon(vector: Vector, epsilon: float) -> Ve
     Typically, this is done in order to avoid numerical problems when there is an element-wise
     division by ``vector`` and that the elements of ``vector`` are very close to 0.
     """
-    bound = np.where(vector < 0, -1, 1) * epsilon
-    return np.where(np.abs(vector) < epsilon, bound, vector)
+    return np.where(np.abs(vector) < epsilon, np.copysign(epsilon, vector), vector)
 
 
 def validate_valid_treatment_variant_not_control(
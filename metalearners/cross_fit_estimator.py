@@ -2,23 +2,27 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import warnings
+from collections.abc import Iterable, Sequence
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import dataclass, field
 from functools import partial
+from itertools import repeat
 
 import numpy as np
+import pandas as pd
+import scipy.sparse
+from joblib import Parallel, delayed, effective_n_jobs, parallel_backend
+from joblib.parallel import get_active_backend
 from sklearn.base import is_classifier, is_regressor
 from sklearn.metrics import accuracy_score, r2_score
-from sklearn.model_selection import (
-    KFold,
-    StratifiedKFold,
-    cross_validate,
-)
+from sklearn.model_selection import KFold, StratifiedKFold, check_cv
 from typing_extensions import Self
 
 from metalearners._typing import Matrix, OosMethod, PredictMethod, SplitIndices, Vector
 from metalearners._utils import (
     _ScikitModel,
     index_matrix,
+    index_vector,
     safe_len,
     validate_number_positive,
 )
@@ -28,6 +32,10 @@ MEDIAN: OosMethod = "median"
 _MEAN: OosMethod = "mean"
 _OOS_WHITELIST = [OVERALL, MEDIAN, _MEAN]
 
+# Number of observations for which the predictions of all folds are aggregated at
+# once when using the ``"mean"`` or ``"median"`` ``oos_method``.
+_PREDICTION_BLOCK_SIZE = 2**16
+
 
 def _validate_oos_method(
     oos_method: OosMethod | None, enable_overall: bool, n_folds: int
@@ -58,7 +66,7 @@ def _validate_n_folds(n_folds: int) -> None:
 
 
 def _validate_data_match_prior_split(
-    n_observations: int, test_indices: tuple[np.ndarray] | None
+    n_observations: int, test_indices: Sequence[np.ndarray] | None
 ) -> None:
     """Validate whether the previous test_indices and the passed data are based on the
     same number of observations."""
@@ -73,6 +81,100 @@ def _validate_data_match_prior_split(
         )
 
 
+def _cross_fitting_backend(n_jobs: int | None) -> AbstractContextManager:
+    """Limit the worker processes used for cross-fitting to a single thread each.
+
+    Otherwise, every worker fitting a fold may use its own BLAS and OpenMP threadpools
+    on all cores, oversubscribing the machine. Backends chosen by the user as well as
+    nested parallelism are left untouched and a number of jobs configured by the user
+    is carried over.
+    """
+    backend, _ = get_active_backend()
+    if (
+        effective_n_jobs(n_jobs) > 1
+        and backend.supports_inner_max_num_threads
+        and backend.inner_max_num_threads is None
+        and not backend.nesting_level
+    ):
+        return parallel_backend(
+            "loky", n_jobs=effective_n_jobs(n_jobs), inner_max_num_threads=1
+        )
+    return nullcontext()
+
+
+def _fit_estimator(
+    estimator: _ScikitModel,
+    X: Matrix,
+    y: Vector | Matrix,
+    fit_params: dict,
+    train_indices: np.ndarray | None = None,
+) -> _ScikitModel:
+    """Fit ``estimator`` on the rows ``train_indices`` or on all rows if ``None``.
+
+    The rows are selected here rather than by the caller such that only the training
+    data of the folds being fitted at a time is materialized and parallel workers
+    receive the full ``X`` only once.
+    """
+    if train_indices is None:
+        return estimator.fit(X, y, **fit_params)
+    return estimator.fit(
+        index_matrix(X, train_indices),
+        _index_rows(y, train_indices),
+        **_index_fit_params(fit_params, safe_len(X), train_indices),
+    )
+
+
+def _index_rows(data: Matrix | Vector, rows: np.ndarray) -> Matrix | Vector:
+    """Subselect certain rows from a vector or a matrix of any dimension."""
+    if isinstance(data, pd.DataFrame):
+        return index_matrix(data, rows)
+    return index_vector(data, rows)
+
+
+def _index_fit_params(fit_params: dict, n_samples: int, rows: np.ndarray) -> dict:
+    """Subselect certain rows from the fit parameters which are aligned with the
+    samples.
+
+    Array-likes with one entry per sample, e.g. ``sample_weight``, are indexed while
+    all other parameters are passed through unchanged.
+    """
+    indexed_fit_params = {}
+    for name, value in fit_params.items():
+        is_array_like = isinstance(
+            value, list | np.ndarray | pd.Series | pd.DataFrame
+        ) or scipy.sparse.issparse(value)
+        if is_array_like and safe_len(value) == n_samples:
+            if isinstance(value, list):
+                value = np.asarray(value)
+            value = _index_rows(value, rows)
+        indexed_fit_params[name] = value
+    return indexed_fit_params
+
+
+def _row_blocks(n_observations: int) -> Iterable[slice]:
+    for start in range(0, n_observations, _PREDICTION_BLOCK_SIZE):
+        yield slice(start, min(start + _PREDICTION_BLOCK_SIZE, n_observations))
+
+
+def _index_block(X: Matrix, block: slice) -> Matrix:
+    if block.start == 0 and block.stop == safe_len(X):
+        return X
+    return index_matrix(X, block)  # type: ignore
+
+
+def _reshape_fold_prediction(
+    fold_prediction: np.ndarray, n_observations: int, n_outputs: int
+) -> np.ndarray:
+    """Bring a base estimator's prediction to shape ``(n_observations, n_outputs)``.
+
+    Predictions which already have the target shape are returned as they are, even if
+    they are not C-contiguous, since reshaping would copy them in that case.
+    """
+    if np.shape(fold_prediction) == (n_observations, n_outputs):
+        return fold_prediction
+    return np.reshape(fold_prediction, (n_observations, n_outputs))
+
+
 @dataclass
 class CrossFitEstimator:
     """Helper class for cross-fitting estimators on data.
@@ -95,6 +197,17 @@ class CrossFitEstimator:
     that case, the ``CrossFitEstimator`` would only fit one overall model which would be
     the one used for either in sample or out of sample predictions. Note that this is
     not recommended since it can lead to data leakage when doing in-sample predictions.
+
+    ``n_jobs`` is the default number of jobs used for cross-fitting if none is passed
+    to :meth:`~metalearners.cross_fit_estimator.CrossFitEstimator.fit`. Since the
+    folds are independent of each other, base estimators which are CPU-bound can be
+    fitted on several cores at once. ``n_jobs`` is also used for the number of threads
+    predicting with the ``n_folds`` estimators.
+
+    ``dtype`` is the data type of predictions combined from the ``n_folds``
+    estimators, i.e. in-sample predictions and out-of-sample predictions with the
+    ``"mean"`` or ``"median"`` ``oos_method``. Using ``np.float32`` halves the memory
+    needed for these predictions at the cost of precision.
     """
 
     n_folds: int
@@ -102,12 +215,15 @@ class CrossFitEstimator:
     estimator_params: dict = field(default_factory=dict)
     enable_overall: bool = True
     random_state: int | None = None
+    n_jobs: int | None = None
+    dtype: type[np.floating] = np.float64
     _estimators: list[_ScikitModel] = field(init=False)
     _estimator_type: str = field(init=False)
     _overall_estimator: _ScikitModel | None = field(init=False)
-    _test_indices: tuple[np.ndarray] | None = field(init=False)
+    _test_indices: list[np.ndarray] | None = field(init=False)
     _n_classes: int | None = field(init=False)
     classes_: np.ndarray | None = field(init=False)
+    _prediction_memo: dict | None = field(init=False)
 
     def __post_init__(self):
         _validate_n_folds(self.n_folds)
@@ -120,16 +236,10 @@ class CrossFitEstimator:
         self._estimators: list[_ScikitModel] = []
         self._estimator_type: str = self.estimator_factory._estimator_type
         self._overall_estimator: _ScikitModel | None = None
-        self._test_indices: tuple[np.ndarray] | None = None
+        self._test_indices: list[np.ndarray] | None = None
         self._n_classes: int | None = None
         self.classes_: np.ndarray | None = None
-
-    def _train_overall_estimator(
-        self, X: Matrix, y: Matrix | Vector, fit_params: dict | None = None
-    ) -> _ScikitModel:
-        fit_params = fit_params or dict()
-        model = self.estimator_factory(**self.estimator_params)
-        return model.fit(X, y, **fit_params)
+        self._prediction_memo: dict | None = None
 
     def clone(self) -> "CrossFitEstimator":
         r"""Construct a new unfitted CrossFitEstimator with the same init parameters."""
@@ -139,6 +249,8 @@ class CrossFitEstimator:
             estimator_params=self.estimator_params,
             enable_overall=self.enable_overall,
             random_state=self.random_state,
+            n_jobs=self.n_jobs,
+            dtype=self.dtype,
         )
 
     def fit(
@@ -156,6 +268,7 @@ class CrossFitEstimator:
         If ``enable_overall`` is set, an additional estimator is trained on all data.
 
         ``n_jobs_cross_fitting`` can be used to specify the number of jobs for cross-fitting.
+        If it is ``None``, the ``n_jobs`` attribute of the ``CrossFitEstimator`` is used.
         For more information see the `sklearn glossary <https://scikit-learn.org/stable/glossary.html#term-n_jobs>`_.
 
         ``cv`` can optionally be passed. If passed, it is expected to be a list of
@@ -166,6 +279,9 @@ class CrossFitEstimator:
 
         if fit_params is None:
             fit_params = dict()
+        if n_jobs_cross_fitting is None:
+            n_jobs_cross_fitting = self.n_jobs
+        splits = []
         if self.n_folds > 1:
             if cv is None:
                 if is_classifier(self):
@@ -180,24 +296,39 @@ class CrossFitEstimator:
                         shuffle=True,
                         random_state=self.random_state,
                     )
-            cv_result = cross_validate(
-                self.estimator_factory(**self.estimator_params),
-                X,
-                y,
-                cv=cv,
-                return_estimator=True,
-                return_indices=True,
-                params=fit_params,
-                n_jobs=n_jobs_cross_fitting,
+            splits = list(check_cv(cv, y, classifier=is_classifier(self)).split(X, y))
+
+        # The overall estimator and the fold estimators are fitted in a single
+        # Parallel call so that they share the same workers. The overall estimator is
+        # dispatched first as it is fitted on the most data.
+        train_indices_per_job: list[np.ndarray | None] = (
+            [None] if self.enable_overall else []
+        )
+        train_indices_per_job.extend(train_indices for train_indices, _ in splits)
+        # The jobs are passed lazily such that at most pre_dispatch folds are
+        # materialized at once.
+        with _cross_fitting_backend(n_jobs_cross_fitting):
+            estimators = Parallel(n_jobs=n_jobs_cross_fitting)(
+                delayed(_fit_estimator)(
+                    self.estimator_factory(**self.estimator_params),
+                    X,
+                    y,
+                    fit_params,
+                    train_indices,
+                )
+                for train_indices in train_indices_per_job
             )
-            self._estimators = cv_result["estimator"]
-            self._test_indices = cv_result["indices"]["test"]
         if self.enable_overall:
-            self._overall_estimator = self._train_overall_estimator(X, y, fit_params)
+            self._overall_estimator = estimators.pop(0)
+        if splits:
+            self._estimators = estimators
+            # Sorted test indices make for monotonic reads of X and writes of the
+            # predictions when predicting in-sample.
+            self._test_indices = [np.sort(test_indices) for _, test_indices in splits]
 
         if is_classifier(self):
-            self._n_classes = len(np.unique(y))
             self.classes_ = np.unique(y)
+            self._n_classes = len(self.classes_)
             for e in self._estimators:
                 if set(e.classes_) != set(self.classes_):  # type: ignore
                     raise ValueError(
@@ -210,35 +341,95 @@ class CrossFitEstimator:
     def _initialize_prediction_tensor(
         self, n_observations: int, n_outputs: int, n_folds: int
     ) -> np.ndarray:
-        return np.zeros((n_observations, n_outputs, n_folds))
+        # Every entry is overwritten by the fold predictions, hence no need to initialize.
+        # Single output predictions don't come with an output dimension.
+        if n_outputs == 1:
+            return np.empty((n_observations, n_folds), dtype=self.dtype)
+        return np.empty((n_observations, n_outputs, n_folds), dtype=self.dtype)
 
     def _n_outputs(self, method: PredictMethod) -> int:
         if method == "predict_proba" and self._n_classes:
             return self._n_classes
         return 1
 
+    def _fold_predictions(
+        self, Xs: Iterable[Matrix], method: PredictMethod
+    ) -> Iterable[np.ndarray]:
+        """Predict with each of the ``n_folds`` estimators on the respective element of
+        ``Xs``.
+
+        If a single job is used, the predictions are generated lazily such that only one
+        of them needs to be held in memory at a time.
+        """
+        if effective_n_jobs(self.n_jobs) == 1:
+            return (
+                getattr(estimator, method)(X)
+                for estimator, X in zip(self._estimators, Xs)
+            )
+        # Threads are preferred since the prediction of most base estimators releases
+        # the GIL and X would otherwise need to be sent to every worker process.
+        return Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(getattr(estimator, method))(X)
+            for estimator, X in zip(self._estimators, Xs)
+        )
+
     def _predict_all(self, X: Matrix, method: PredictMethod) -> np.ndarray:
+        n_observations = safe_len(X)
         n_outputs = self._n_outputs(method)
         predictions = self._initialize_prediction_tensor(
-            n_observations=safe_len(X),
+            n_observations=n_observations,
             n_outputs=n_outputs,
             n_folds=self.n_folds,
         )
-        for i, estimator in enumerate(self._estimators):
-            predictions[:, :, i] = np.reshape(
-                getattr(estimator, method)(X), (safe_len(X), n_outputs)
-            )
-        if n_outputs == 1:
-            return predictions[:, 0, :]
+        for i, fold_prediction in enumerate(self._fold_predictions(repeat(X), method)):
+            if n_outputs == 1:
+                predictions[:, i] = np.reshape(fold_prediction, n_observations)
+            else:
+                predictions[:, :, i] = _reshape_fold_prediction(
+                    fold_prediction, n_observations, n_outputs
+                )
         return predictions
 
     def _predict_mean(self, X: Matrix, method: PredictMethod) -> np.ndarray:
-        all_predictions = self._predict_all(X=X, method=method)
-        return np.mean(all_predictions, axis=-1)
+        # Contrary to the median, the mean can be accumulated fold by fold without
+        # materializing the predictions of all folds. Moreover, the accumulation is
+        # done block by block so that the fold predictions needn't be held in memory
+        # for all observations at once.
+        n_observations = safe_len(X)
+        n_outputs = self._n_outputs(method)
+        predictions = np.zeros((n_observations, n_outputs), dtype=self.dtype)
+        for block in _row_blocks(n_observations):
+            X_block = _index_block(X, block)
+            block_predictions = predictions[block]
+            for fold_prediction in self._fold_predictions(repeat(X_block), method):
+                block_predictions += _reshape_fold_prediction(
+                    fold_prediction, len(block_predictions), n_outputs
+                )
+        predictions /= self.n_folds
+        if n_outputs == 1:
+            return predictions[:, 0]
+        return predictions
 
     def _predict_median(self, X: Matrix, method: PredictMethod) -> np.ndarray:
-        all_predictions = self._predict_all(X=X, method=method)
-        return np.median(all_predictions, axis=-1)
+        n_observations = safe_len(X)
+        if n_observations <= _PREDICTION_BLOCK_SIZE:
+            # all_predictions is a temporary; partitioning it in place spares
+            # np.median from copying the whole tensor.
+            return np.median(
+                self._predict_all(X=X, method=method), axis=-1, overwrite_input=True
+            )
+        n_outputs = self._n_outputs(method)
+        predictions = np.empty(
+            (n_observations,) if n_outputs == 1 else (n_observations, n_outputs),
+            dtype=self.dtype,
+        )
+        for block in _row_blocks(n_observations):
+            predictions[block] = np.median(
+                self._predict_all(X=_index_block(X, block), method=method),
+                axis=-1,
+                overwrite_input=True,
+            )
+        return predictions
 
     def _predict_in_sample(
         self,
@@ -247,27 +438,34 @@ class CrossFitEstimator:
     ) -> np.ndarray:
         if not self._test_indices:
             raise ValueError()
-        if safe_len(X) != sum(len(fold) for fold in self._test_indices):
+        n_observations = safe_len(X)
+        n_training_observations = sum(len(fold) for fold in self._test_indices)
+        if n_observations != n_training_observations:
             raise ValueError(
                 "Trying to predict in-sample on data that is unlike data encountered in training. "
-                f"Training data included {sum(len(fold) for fold in self._test_indices)} "
-                f"observations while prediction data includes {safe_len(X)} observations."
+                f"Training data included {n_training_observations} "
+                f"observations while prediction data includes {n_observations} observations."
             )
         n_outputs = self._n_outputs(method)
-        predictions = self._initialize_prediction_tensor(
-            n_observations=safe_len(X),
-            n_outputs=n_outputs,
-            n_folds=1,
+        # Every observation is predicted by exactly one estimator, the one for which it
+        # was part of the test fold. Hence there is no need for a fold dimension.
+        # Single output predictions are scattered as vectors, without an output
+        # dimension.
+        predictions = np.empty(
+            (n_observations,) if n_outputs == 1 else (n_observations, n_outputs),
+            dtype=self.dtype,
         )
-        for estimator, indices in zip(self._estimators, self._test_indices):
-            fold_predictions = np.reshape(
-                getattr(estimator, method)(index_matrix(X, indices)),
-                (len(indices), n_outputs, 1),
-            )
-            predictions[indices] = fold_predictions
-        if n_outputs == 1:
-            return predictions[:, 0, 0]
-        return predictions[:, :, 0]
+        fold_predictions = self._fold_predictions(
+            (index_matrix(X, indices) for indices in self._test_indices), method
+        )
+        for fold_prediction, indices in zip(fold_predictions, self._test_indices):
+            if n_outputs == 1:
+                predictions[indices] = np.reshape(fold_prediction, len(indices))
+            else:
+                predictions[indices] = _reshape_fold_prediction(
+                    fold_prediction, len(indices), n_outputs
+                )
+        return predictions
 
     def _predict(
         self,
@@ -275,15 +473,36 @@ class CrossFitEstimator:
         is_oos: bool,
         method: PredictMethod,
         oos_method: OosMethod | None = None,
+    ) -> np.ndarray:
+        if self._prediction_memo is None:
+            return self._predict_uncached(X, is_oos, method, oos_method)
+        # X is stored alongside the predictions so that its id can't be reused by
+        # another object while the memo is active.
+        key = (id(X), is_oos, method, oos_method)
+        if key not in self._prediction_memo:
+            self._prediction_memo[key] = (
+                X,
+                self._predict_uncached(X, is_oos, method, oos_method),
+            )
+        return self._prediction_memo[key][1]
+
+    def _predict_uncached(
+        self,
+        X: Matrix,
+        is_oos: bool,
+        method: PredictMethod,
+        oos_method: OosMethod | None = None,
     ) -> np.ndarray:
         if is_oos:
-            _validate_oos_method(oos_method, self.enable_overall, self.n_folds)
-            if oos_method == OVERALL:
+            if oos_method == OVERALL and self.enable_overall:
+                # Fast path for the most common out-of-sample case which doesn't
+                # require any validation.
                 return getattr(self._overall_estimator, method)(X)
+            _validate_oos_method(oos_method, self.enable_overall, self.n_folds)
             if oos_method == _MEAN:
-                if method != "predict_proba" and any(
-                    is_classifier(est) for est in self._estimators
-                ):
+                # All fold estimators stem from estimator_factory, hence checking
+                # the CrossFitEstimator itself suffices.
+                if method != "predict_proba" and is_classifier(self):
                     raise ValueError(
                         "Cannot create a mean of classes. Please use a different oos_method."
                     )
@@ -371,6 +590,13 @@ class CrossFitEstimator:
 
 
 class _PredictContext:
+    """Fix ``is_oos`` and ``oos_method`` of a
+    :class:`~metalearners.cross_fit_estimator.CrossFitEstimator`'s predict methods.
+
+    Within the context, predictions are memoized per ``X`` object and predict method.
+    Hence ``X`` must not be modified in place while the context is active.
+    """
+
     def __init__(
         self,
         model: CrossFitEstimator,
@@ -400,8 +626,10 @@ class _PredictContext:
         )
         new_predict_proba.__name__ = "predict_proba"  # type: ignore
         self.model.predict_proba = new_predict_proba  # type: ignore
+        self.model._prediction_memo = {}
         return self.model
 
     def __exit__(self, *args):
+        self.model._prediction_memo = None
         self.model.predict = self.original_predict  # type: ignore
         self.model.predict_proba = self.original_predict_proba  # type: ignore
@@ -10,6 +10,7 @@ from typing import Any, TypedDict
 import numpy as np
 import pandas as pd
 import shap
+from joblib import Parallel, delayed, effective_n_jobs
 from sklearn.metrics import get_scorer
 from sklearn.model_selection import KFold
 from typing_extensions import Self
@@ -54,52 +55,38 @@ def _parse_fit_params(
     nuisance_model_names: set[str],
     treatment_model_names: set[str],
 ) -> dict[str, dict[str, dict[str, dict]]]:
-
-    def _get_raw_fit_params():
-        return fit_params
-
-    def _get_empty_dict():
-        return dict()
-
-    def _get_result_skeleton(
-        default_value_getter: Callable,
-    ) -> dict[str, dict[str, dict[str, dict]]]:
+    if fit_params is None or (
+        (NUISANCE not in fit_params) and (TREATMENT not in fit_params)
+    ):
+        # The same fit_params are used for all models.
         return {
             NUISANCE: {
-                nuisance_model_kind: default_value_getter()
+                nuisance_model_kind: fit_params or dict()
                 for nuisance_model_kind in nuisance_model_names
             },
             TREATMENT: {
-                treatment_model_kind: default_value_getter()
+                treatment_model_kind: fit_params or dict()
                 for treatment_model_kind in treatment_model_names
             },
         }
 
-    if fit_params is None or (
-        (NUISANCE not in fit_params) and (TREATMENT not in fit_params)
-    ):
-        default_value_getter = _get_raw_fit_params if fit_params else _get_empty_dict
-        return _get_result_skeleton(default_value_getter)
-
-    result = _get_result_skeleton(_get_empty_dict)
-
-    if NUISANCE in fit_params:
-        for nuisance_model_kind in nuisance_model_names:
-            if nuisance_model_kind in fit_params[NUISANCE]:
-                result[NUISANCE][nuisance_model_kind] = fit_params[NUISANCE][
-                    nuisance_model_kind
-                ]
-    if TREATMENT in fit_params:
-        for treatment_model_kind in treatment_model_names:
-            if treatment_model_kind in fit_params[TREATMENT]:
-                result[TREATMENT][treatment_model_kind] = fit_params[TREATMENT][
-                    treatment_model_kind
-                ]
-    return result
-
-
-def _initialize_model_dict(argument, expected_names: Collection[str]) -> dict:
-    if isinstance(argument, dict) and set(argument.keys()) >= set(expected_names):
+    nuisance_fit_params = fit_params.get(NUISANCE, dict())
+    treatment_fit_params = fit_params.get(TREATMENT, dict())
+    return {
+        NUISANCE: {
+            nuisance_model_kind: nuisance_fit_params.get(nuisance_model_kind, dict())
+            for nuisance_model_kind in nuisance_model_names
+        },
+        TREATMENT: {
+            treatment_model_kind: treatment_fit_params.get(treatment_model_kind, dict())
+            for treatment_model_kind in treatment_model_names
+        },
+    }
+
+
+def _initialize_model_dict(argument, expected_names: Set[str]) -> dict:
+    # dict_keys support set comparisons without being copied into a set.
+    if isinstance(argument, dict) and argument.keys() >= expected_names:
         return {key: argument[key] for key in expected_names}
     return {name: argument for name in expected_names}
 
@@ -112,7 +99,10 @@ def _combine_propensity_and_nuisance_specs(
         non_propensity_model_dict = _initialize_model_dict(
             nuisance_specs, non_propensity_nuisance_model_names
         )
-        return non_propensity_model_dict | {PROPENSITY_MODEL: propensity_specs}
+        # _initialize_model_dict always returns a fresh dict, so it can be extended
+        # in place rather than merged into yet another one.
+        non_propensity_model_dict[PROPENSITY_MODEL] = propensity_specs
+        return non_propensity_model_dict
 
     return _initialize_model_dict(nuisance_specs, nuisance_model_names)
 
@@ -123,10 +113,14 @@ def _filter_x_columns(X: Matrix, feature_set: Features) -> Matrix:
     elif len(feature_set) == 0:
         X_filtered = np.ones((safe_len(X), 1))
     else:
+        # Feature sets which are already lists or arrays are used as is instead of
+        # being copied on every call.
         if isinstance(X, pd.DataFrame):
-            X_filtered = X[list(feature_set)]
+            X_filtered = X[
+                feature_set if isinstance(feature_set, list) else list(feature_set)
+            ]
         else:
-            X_filtered = X[:, np.array(feature_set)]
+            X_filtered = X[:, np.asarray(feature_set)]
     return X_filtered
 
 
@@ -164,34 +158,45 @@ def _evaluate_model_kind(
 ) -> dict[str, float]:
     """Helper function to evaluate all the models of the same model kind."""
     prefix = f"{model_kind}_"
-    evaluation_metrics: dict[str, float] = {}
+    named_scorers: list[tuple[str, Callable]] = []
     for idx, scorer in enumerate(scorers):
         if isinstance(scorer, str):
-            scorer_name = scorer
-            scorer_callable: Callable = get_scorer(scorer)
+            named_scorers.append((scorer, get_scorer(scorer)))
+        else:
+            named_scorers.append((f"custom_scorer_{idx}", scorer))
+    index_strs: list[str] = []
+    for i in range(len(cfes)):
+        if is_treatment_model:
+            treatment_variant = i + 1
+            index_strs.append(f"{treatment_variant}_vs_0_")
         else:
-            scorer_name = f"custom_scorer_{idx}"
-            scorer_callable = scorer
-        for i, cfe in enumerate(cfes):
-            if is_treatment_model:
-                treatment_variant = i + 1
-                index_str = f"{treatment_variant}_vs_0_"
+            if len(cfes) == 1:
+                index_strs.append("")
             else:
-                if len(cfes) == 1:
-                    index_str = ""
-                else:
-                    index_str = f"{i}_"
-            name = f"{prefix}{index_str}{scorer_name}"
-            X_filtered = _filter_x_columns(Xs[i], feature_set)
-            with _PredictContext(cfe, is_oos, oos_method) as modified_cfe:
+                index_strs.append(f"{i}_")
+    scores: dict[tuple[int, int], float] = {}
+    for i, cfe in enumerate(cfes):
+        X_filtered = _filter_x_columns(Xs[i], feature_set)
+        # All scorers are evaluated within the same context such that predictions
+        # are only computed once per predict method.
+        with _PredictContext(cfe, is_oos, oos_method) as modified_cfe:
+            for scorer_idx, (_, scorer_callable) in enumerate(named_scorers):
                 if sample_weights:
-                    evaluation_metrics[name] = scorer_callable(
+                    scores[scorer_idx, i] = scorer_callable(
                         modified_cfe, X_filtered, ys[i], sample_weight=sample_weights[i]
                     )
                 else:
-                    evaluation_metrics[name] = scorer_callable(
+                    scores[scorer_idx, i] = scorer_callable(
                         modified_cfe, X_filtered, ys[i]
                     )
+    # The metrics are ordered by scorer first and by model second, independently of
+    # the order in which they are computed.
+    evaluation_metrics: dict[str, float] = {}
+    for scorer_idx, (scorer_name, _) in enumerate(named_scorers):
+        for i, index_str in enumerate(index_strs):
+            evaluation_metrics[f"{prefix}{index_str}{scorer_name}"] = scores[
+                scorer_idx, i
+            ]
     return evaluation_metrics
 
 
@@ -274,7 +279,9 @@ class MetaLearner(ABC):
 
     To reuse already fitted models  ``fitted_nuisance_models`` and ``fitted_propensity_model``
     should be used. The models should be fitted on the same data the MetaLearner is going
-    to call fit with. For an illustration, see :ref:`our example on reusing models <example-reuse>`.
+    to call fit with. These models are not copied but shared with the MetaLearner.
+    Refitting the MetaLearner which originally fitted them does not alter them.
+    For an illustration, see :ref:`our example on reusing models <example-reuse>`.
     """
 
     @classmethod
@@ -319,40 +326,49 @@ class MetaLearner(ABC):
             )
 
     def _validate_treatment(self, w: Vector) -> None:
-        if len(np.unique(w)) != self.n_variants:
+        w_array = np.asarray(w)
+        if (
+            np.issubdtype(w_array.dtype, np.integer)
+            and len(w_array) > 0
+            and w_array.min() >= 0
+            and w_array.max() < self.n_variants
+            and np.bincount(w_array, minlength=self.n_variants).all()
+        ):
+            # Fast path for the expected encoding which avoids sorting w.
+            return
+        variants = np.unique(w)
+        if len(variants) != self.n_variants:
             raise ValueError(
                 "Number of variants present in the treatment are different than the "
                 "number specified at instantiation."
             )
         # TODO: add support for different encoding of treatment variants (str, not consecutive ints...)
-        if set(np.unique(w)) != set(range(self.n_variants)):
+        # np.unique returns sorted values, hence they need to equal 0, ..., n_variants - 1.
+        if not np.array_equal(variants, np.arange(self.n_variants)):
             raise ValueError(
                 "Treatment variant should be encoded with values "
                 f"{{0...{self.n_variants -1}}} and all variants should be present. "
-                f"Yet we found the values {set(np.unique(w))}."
+                f"Yet we found the values {set(variants)}."
             )
 
     def _validate_outcome(self, y: Vector, w: Vector) -> None:
-        if (
-            self.is_classification
-            and not self._supports_multi_class()
-            and len(np.unique(y)) > 2
-        ):
+        if not self.is_classification:
+            return
+        if not self._supports_multi_class() and (n_classes := len(np.unique(y))) > 2:
             raise ValueError(
                 f"{self.__class__.__name__} does not support multiclass classification."
-                f" Yet we found {len(np.unique(y))} classes."
+                f" Yet we found {n_classes} classes."
             )
-        if self.is_classification:
-            classes_0 = set(np.unique(y[w == 0]))
-            for tv in range(self.n_variants):
-                if set(np.unique(y[w == tv])) != classes_0:
-                    raise ValueError(
-                        f"Variants 0 and {tv} have seen different sets of classification outcomes. Please check your data."
-                    )
-            if len(classes_0) == 1:
+        classes_0 = np.unique(y[w == 0])
+        for tv in range(1, self.n_variants):
+            if not np.array_equal(np.unique(y[w == tv]), classes_0):
                 raise ValueError(
-                    f"There is only one class present in the classification outcome: {classes_0}. Please check your data."
+                    f"Variants 0 and {tv} have seen different sets of classification outcomes. Please check your data."
                 )
+        if len(classes_0) == 1:
+            raise ValueError(
+                f"There is only one class present in the classification outcome: {set(classes_0)}. Please check your data."
+            )
 
     def _validate_models(self) -> None:
         """Validate that the base models are appropriate.
@@ -362,23 +378,17 @@ class MetaLearner(ABC):
         a model to be used with ``"predict_proba"`` is recognized by ``scikit-learn` as
         a classifier via ``sklearn.base.is_classifier``.
         """
-        for model_kind in self.nuisance_model_specifications():
+        for model_kind, predict_method in self._nuisance_predict_methods.items():
             if model_kind in self._prefitted_nuisance_models:
                 factory = self._nuisance_models[model_kind][0].estimator_factory
             else:
                 factory = self.nuisance_model_factory[model_kind]
-            predict_method = self.nuisance_model_specifications()[model_kind][
-                "predict_method"
-            ](self)
             validate_model_and_predict_method(
                 factory, predict_method, name=f"nuisance model {model_kind}"
             )
 
-        for model_kind in self.treatment_model_specifications():
+        for model_kind, predict_method in self._treatment_predict_methods.items():
             factory = self.treatment_model_factory[model_kind]
-            predict_method = self.treatment_model_specifications()[model_kind][
-                "predict_method"
-            ](self)
             validate_model_and_predict_method(
                 factory, predict_method, name=f"treatment model {model_kind}"
             )
@@ -389,19 +399,21 @@ class MetaLearner(ABC):
     ) -> dict[str, dict[str, dict[str, dict]]]:
         return _parse_fit_params(
             fit_params=fit_params,
-            nuisance_model_names=set(self.nuisance_model_specifications().keys()),
-            treatment_model_names=set(self.treatment_model_specifications().keys()),
+            nuisance_model_names=set(self._nuisance_model_specifications.keys()),
+            treatment_model_names=set(self._treatment_model_specifications.keys()),
         )
 
-    def _split(self, X: Matrix) -> SplitIndices:
+    def _split(self, n_observations: int) -> SplitIndices:
         _validate_n_folds_synchronize(self.n_folds)
         n_folds = min(self.n_folds.values())
+        # KFold only depends on the number of observations, hence there is no need
+        # to materialize the data which is split.
         cv_split_indices = list(
             KFold(
                 n_splits=n_folds,
                 shuffle=True,
                 random_state=self.random_state,
-            ).split(X)
+            ).split(np.empty((n_observations, 0)))
         )
         return cv_split_indices
 
@@ -460,6 +472,20 @@ class MetaLearner(ABC):
         self.is_classification = is_classification
         self.n_variants = n_variants
 
+        # The specifications and the predict methods derived from them only depend
+        # on the fields set above. They are resolved once rather than in every call
+        # to e.g. predict_nuisance.
+        self._nuisance_model_specifications = nuisance_model_specifications
+        self._treatment_model_specifications = treatment_model_specifications
+        self._nuisance_predict_methods: dict[str, PredictMethod] = {
+            model_kind: model_specifications["predict_method"](self)
+            for model_kind, model_specifications in nuisance_model_specifications.items()
+        }
+        self._treatment_predict_methods: dict[str, PredictMethod] = {
+            model_kind: model_specifications["predict_method"](self)
+            for model_kind, model_specifications in treatment_model_specifications.items()
+        }
+
         self.nuisance_model_factory = _combine_propensity_and_nuisance_specs(
             propensity_model_factory,
             nuisance_model_factory,
@@ -476,31 +502,26 @@ class MetaLearner(ABC):
         )
 
         self.treatment_model_factory = _initialize_model_dict(
-            treatment_model_factory, set(treatment_model_specifications.keys())
+            treatment_model_factory, treatment_model_specifications.keys()
         )
         if treatment_model_params is None:
             self.treatment_model_params = _initialize_model_dict(
-                {}, set(treatment_model_specifications.keys())
+                {}, treatment_model_specifications.keys()
             )
         else:
             self.treatment_model_params = _initialize_model_dict(
-                treatment_model_params, set(treatment_model_specifications.keys())
+                treatment_model_params, treatment_model_specifications.keys()
             )
 
-        self.n_folds = _initialize_model_dict(
-            n_folds,
-            set(nuisance_model_specifications.keys())
-            | set(treatment_model_specifications.keys()),
+        model_names = (
+            nuisance_model_specifications.keys() | treatment_model_specifications.keys()
         )
+        self.n_folds = _initialize_model_dict(n_folds, model_names)
         for model_kind, n_folds_model_kind in self.n_folds.items():
             validate_number_positive(n_folds_model_kind, f"{model_kind} n_folds", True)
         self.random_state = random_state
 
-        self.feature_set = _initialize_model_dict(
-            feature_set,
-            set(nuisance_model_specifications.keys())
-            | set(treatment_model_specifications.keys()),
-        )
+        self.feature_set = _initialize_model_dict(feature_set, model_names)
 
         self._nuisance_models: dict[str, list[CrossFitEstimator]] = {}
         not_fitted_nuisance_models = set(nuisance_model_specifications.keys())
@@ -514,7 +535,12 @@ class MetaLearner(ABC):
                     "The keys present in fitted_nuisance_models should be a subset of "
                     f"{set(nuisance_model_specifications.keys()) - {PROPENSITY_MODEL}}"
                 )
-            self._nuisance_models |= deepcopy(fitted_nuisance_models)
+            # The pre-fitted CrossFitEstimators are never refitted, hence they can be
+            # shared with the caller instead of being deep-copied.
+            self._nuisance_models |= {
+                model_kind: list(cfes)
+                for model_kind, cfes in fitted_nuisance_models.items()
+            }
             not_fitted_nuisance_models -= set(fitted_nuisance_models.keys())
             self._prefitted_nuisance_models |= set(fitted_nuisance_models.keys())
 
@@ -568,35 +594,6 @@ class MetaLearner(ABC):
 
         self._validate_models()
 
-    def _nuisance_tensors(self, n_obs: int) -> dict[str, list[np.ndarray]]:
-        def dimension(n_obs, model_kind, model_ord, predict_method):
-            if (
-                n_outputs := self._nuisance_models[model_kind][model_ord]._n_outputs(
-                    predict_method
-                )
-            ) > 1:
-                return (n_obs, n_outputs)
-            return (n_obs,)
-
-        nuisance_tensors: dict[str, list[np.ndarray]] = {}
-        for (
-            model_kind,
-            model_specifications,
-        ) in self.nuisance_model_specifications().items():
-            nuisance_tensors[model_kind] = []
-            for model_ord in range(model_specifications["cardinality"](self)):
-                nuisance_tensors[model_kind].append(
-                    np.zeros(
-                        dimension(
-                            n_obs,
-                            model_kind,
-                            model_ord,
-                            model_specifications["predict_method"](self),
-                        )
-                    )
-                )
-        return nuisance_tensors
-
     def fit_nuisance(
         self,
         X: Matrix,
@@ -615,6 +612,11 @@ class MetaLearner(ABC):
         if model_kind in self._prefitted_nuisance_models:
             return self
         X_filtered = _filter_x_columns(X, self.feature_set[model_kind])
+        # The model is cloned rather than refitted in place since it might be shared
+        # with another MetaLearner reusing it as a pre-fitted model.
+        self._nuisance_models[model_kind][model_ord] = self._nuisance_models[
+            model_kind
+        ][model_ord].clone()
         self._nuisance_models[model_kind][model_ord].fit(
             X_filtered,
             y,
@@ -892,9 +894,7 @@ class MetaLearner(ABC):
         the ``feature_set`` field of ``MetaLearner``.
         """
         X_filtered = _filter_x_columns(X, self.feature_set[model_kind])
-        predict_method_name = self.nuisance_model_specifications()[model_kind][
-            "predict_method"
-        ](self)
+        predict_method_name = self._nuisance_predict_methods[model_kind]
         predict_method = getattr(
             self._nuisance_models[model_kind][model_ord], predict_method_name
         )
@@ -1142,15 +1142,11 @@ class MetaLearner(ABC):
 
         def _default_scoring() -> Scoring:
             return {
-                nuisance_model: [
-                    default_metric(model_specifications["predict_method"](self))
-                ]
-                for nuisance_model, model_specifications in self.nuisance_model_specifications().items()
+                nuisance_model: [default_metric(predict_method)]
+                for nuisance_model, predict_method in self._nuisance_predict_methods.items()
             } | {
-                treatment_model: [
-                    default_metric(model_specifications["predict_method"](self))
-                ]
-                for treatment_model, model_specifications in self.treatment_model_specifications().items()
+                treatment_model: [default_metric(predict_method)]
+                for treatment_model, predict_method in self._treatment_predict_methods.items()
             }
 
         default_scoring = _default_scoring()
@@ -1225,7 +1221,10 @@ class MetaLearner(ABC):
                 f"necessary_model ({necessary_models}) should equal to keys present in models dictionary."
             )
         specifications = (
-            self.nuisance_model_specifications() | self.treatment_model_specifications()
+            self._nuisance_model_specifications | self._treatment_model_specifications
+        )
+        predict_methods = (
+            self._nuisance_predict_methods | self._treatment_predict_methods
         )
         input_format = None
         for model_kind in necessary_models:
@@ -1234,7 +1233,7 @@ class MetaLearner(ABC):
                 raise ValueError(
                     f"{model_kind} cardinality does not match the expected cardinality."
                 )
-            predict_method = model_specification["predict_method"](self)
+            predict_method = predict_methods[model_kind]
             for model_index, model in enumerate(models[model_kind]):
                 if input_format is None:
                     input_format = model.graph.input
@@ -1336,49 +1335,103 @@ class _ConditionalAverageOutcomeMetaLearner(MetaLearner, ABC):
             n_folds=n_folds,
             random_state=random_state,
         )
-        self._treatment_variants_mask: list[np.ndarray] | None = None
+        # The treatment variant of every observation seen during fit. Masks of single
+        # variants are derived from it when needed rather than being stored.
+        self._treatment_variants: np.ndarray | None = None
+
+    def _set_treatment_variants(self, w: Vector) -> np.ndarray:
+        treatment_variants = np.asarray(w).astype(
+            np.min_scalar_type(self.n_variants - 1)
+        )
+        self._treatment_variants = treatment_variants
+        return treatment_variants
+
+    def _treatment_variant_mask(self, treatment_variant: int) -> np.ndarray:
+        if self._treatment_variants is None:
+            raise ValueError(
+                "The MetaLearner's attribute _treatment_variants is None. "
+                "It is typically set during fitting."
+            )
+        return self._treatment_variants == treatment_variant
 
     def predict_conditional_average_outcomes(
-        self, X: Matrix, is_oos: bool, oos_method: OosMethod = OVERALL
+        self,
+        X: Matrix,
+        is_oos: bool,
+        oos_method: OosMethod = OVERALL,
+        n_jobs_base_learners: int | None = None,
     ) -> np.ndarray:
-        if self._treatment_variants_mask is None:
+        """Predict the vectors of conditional average outcomes.
+
+        See :meth:`metalearners.metalearner.MetaLearner.predict_conditional_average_outcomes`.
+
+        ``n_jobs_base_learners`` is the number of threads predicting with the models of
+        the different treatment variants at once. This only speeds up predictions if
+        the base models release the GIL while predicting, as is the case for most
+        ``scikit-learn``, ``lightgbm`` and ``xgboost`` models.
+        """
+        if self._treatment_variants is None:
             raise ValueError(
                 "The metalearner needs to be fitted before predicting."
-                "In particular, the MetaLearner's attribute _treatment_variant_mask, "
+                "In particular, the MetaLearner's attribute _treatment_variants, "
                 "typically set during fitting, is None."
             )
-        # TODO: Consider multiprocessing
         n_obs = safe_len(X)
-        nuisance_tensors = self._nuisance_tensors(n_obs)
-        conditional_average_outcomes_list = nuisance_tensors[VARIANT_OUTCOME_MODEL]
+        n_outputs = self._nuisance_models[VARIANT_OUTCOME_MODEL][0]._n_outputs(
+            self._nuisance_predict_methods[VARIANT_OUTCOME_MODEL]
+        )
+        # The predictions of every variant are written directly into the output
+        # instead of being stacked at the end.
+        conditional_average_outcomes = np.empty((n_obs, self.n_variants, n_outputs))
 
-        for tv in range(self.n_variants):
+        def _predict_variant(tv: int) -> None:
             if is_oos:
-                conditional_average_outcomes_list[tv] = self.predict_nuisance(
-                    X=X,
-                    model_kind=VARIANT_OUTCOME_MODEL,
-                    model_ord=tv,
-                    is_oos=True,
-                    oos_method=oos_method,
+                conditional_average_outcomes[:, tv] = np.reshape(
+                    self.predict_nuisance(
+                        X=X,
+                        model_kind=VARIANT_OUTCOME_MODEL,
+                        model_ord=tv,
+                        is_oos=True,
+                        oos_method=oos_method,
+                    ),
+                    (n_obs, n_outputs),
                 )
-            else:
-                conditional_average_outcomes_list[tv][
-                    self._treatment_variants_mask[tv]
-                ] = self.predict_nuisance(
-                    X=index_matrix(X, self._treatment_variants_mask[tv]),
+                return
+            # The model of variant tv has only been trained on observations which
+            # received tv. Hence, only these can be predicted in-sample.
+            # Integer indices are used both for selecting the rows of X and for
+            # writing the predictions such that the masks are only converted once.
+            mask = self._treatment_variant_mask(tv)
+            indices = np.flatnonzero(mask)
+            complement = np.flatnonzero(~mask)
+            conditional_average_outcomes[indices, tv] = np.reshape(
+                self.predict_nuisance(
+                    X=index_matrix(X, indices),
                     model_kind=VARIANT_OUTCOME_MODEL,
                     model_ord=tv,
                     is_oos=False,
-                )
-                conditional_average_outcomes_list[tv][
-                    ~self._treatment_variants_mask[tv]
-                ] = self.predict_nuisance(
-                    X=index_matrix(X, ~self._treatment_variants_mask[tv]),
+                ),
+                (-1, n_outputs),
+            )
+            conditional_average_outcomes[complement, tv] = np.reshape(
+                self.predict_nuisance(
+                    X=index_matrix(X, complement),
                     model_kind=VARIANT_OUTCOME_MODEL,
                     model_ord=tv,
                     is_oos=True,
                     oos_method=oos_method,
-                )
-        return np.stack(conditional_average_outcomes_list, axis=1).reshape(
-            n_obs, self.n_variants, -1
-        )
+                ),
+                (-1, n_outputs),
+            )
+
+        # Every variant writes to its own slice of the output, hence the variants can
+        # be predicted concurrently. Shared memory is required, rather than merely
+        # preferred, since writes from worker processes would not reach the output.
+        if effective_n_jobs(n_jobs_base_learners) == 1:
+            for tv in range(self.n_variants):
+                _predict_variant(tv)
+        else:
+            Parallel(n_jobs=n_jobs_base_learners, require="sharedmem")(
+                delayed(_predict_variant)(tv) for tv in range(self.n_variants)
+            )
+        return conditional_average_outcomes
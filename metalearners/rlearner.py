@@ -6,7 +6,6 @@ from collections.abc import Mapping, Sequence
 
 import numpy as np
 from joblib import Parallel, delayed
-from sklearn.metrics import root_mean_squared_error
 from typing_extensions import Self
 
 from metalearners._typing import Matrix, OosMethod, Scoring, Vector, _ScikitModel
@@ -75,13 +74,24 @@ def r_loss(
         outcomes,
         treatments,
     ]
-    validate_all_vectors_same_index(inputs)
-
-    residualised_outcomes = outcomes - outcome_estimates
-    residualised_treatments = treatments - propensity_scores
-    return root_mean_squared_error(
-        residualised_outcomes, cate_estimates * residualised_treatments
+    if all(isinstance(vector, np.ndarray) for vector in inputs):
+        # Comparing the lengths suffices in the absence of pandas indices.
+        if len({len(vector) for vector in inputs}) > 1:
+            raise ValueError("All inputs are expected to have the same length.")
+    else:
+        validate_all_vectors_same_index(*inputs)
+
+    # The residuals are combined in place such that, next to the two residual
+    # vectors, no further temporaries of the input length are allocated.
+    residuals = np.subtract(
+        np.asarray(outcomes), np.asarray(outcome_estimates), dtype=np.float64
+    )
+    residualised_treatments = np.subtract(
+        np.asarray(treatments), np.asarray(propensity_scores), dtype=np.float64
     )
+    residualised_treatments *= np.asarray(cate_estimates)
+    residuals -= residualised_treatments
+    return float(np.sqrt(np.mean(np.square(residuals, out=residuals))))
 
 
 class RLearner(MetaLearner):
@@ -180,7 +190,7 @@ class RLearner(MetaLearner):
         self._validate_fit_params(qualified_fit_params)
 
         if synchronize_cross_fitting:
-            cv_split_indices = self._split(X)
+            cv_split_indices = self._split(safe_len(X))
         else:
             cv_split_indices = None
 
@@ -233,6 +243,9 @@ class RLearner(MetaLearner):
         qualified_fit_params = self._qualified_fit_params(fit_params)
         treatment_jobs: list[_ParallelJoblibSpecification] = []
         self._variants_indices = []
+        # The nuisance estimates don't depend on the treatment variant and are
+        # therefore only predicted once.
+        y_estimates, w_estimates = self._nuisance_estimates(X, is_oos=False)
         for treatment_variant in range(1, self.n_variants):
 
             is_treatment = w == treatment_variant
@@ -249,6 +262,8 @@ class RLearner(MetaLearner):
                 mask=mask,
                 epsilon=epsilon,
                 is_oos=False,
+                y_estimates=y_estimates,
+                w_estimates=w_estimates,
             )
 
             X_filtered = index_matrix(X, mask)
@@ -279,71 +294,53 @@ class RLearner(MetaLearner):
     ) -> np.ndarray:
         n_outputs = 2 if self.is_classification else 1
         tau_hat = np.zeros((safe_len(X), self.n_variants - 1, n_outputs))
-
-        if is_oos:
-
-            for treatment_variant in range(1, self.n_variants):
-                variant_estimates = self.predict_treatment(
-                    X,
-                    is_oos=is_oos,
-                    oos_method=oos_method,
-                    model_kind=TREATMENT_MODEL,
-                    model_ord=treatment_variant - 1,
-                )
-                if self.is_classification:
-                    # This is to be consistent with other MetaLearners (e.g. S and T) that automatically
-                    # work with multiclass outcomes and return the CATE estimate for each class. As the R-Learner only
-                    # works with binary classes (the pseudo outcome formula does not make sense with
-                    # multiple classes unless some adaptation is done) we can manually infer the
-                    # CATE estimate for the complementary class  -- returning a matrix of shape (N, 2).
-                    variant_estimates = np.stack(
-                        [-variant_estimates, variant_estimates], axis=-1
-                    )
-                variant_estimates = variant_estimates.reshape(safe_len(X), n_outputs)
-                tau_hat[:, treatment_variant - 1, :] = variant_estimates
-
-            return tau_hat
+        # The estimates are written directly into the last channel of tau_hat.
+        cate_channel = n_outputs - 1
 
         for treatment_variant in range(1, self.n_variants):
-            variant_indices = self._variants_indices[treatment_variant - 1]
-
-            variant_estimates = self.predict_treatment(
-                index_matrix(X, variant_indices),
-                is_oos=False,
-                model_kind=TREATMENT_MODEL,
-                model_ord=treatment_variant - 1,
-            )
-            if sum(~variant_indices) > 0:
-                non_variant_estimates = self.predict_treatment(
-                    index_matrix(X, ~variant_indices),
-                    is_oos=True,
-                    oos_method=oos_method,
-                    model_kind=TREATMENT_MODEL,
-                    model_ord=treatment_variant - 1,
+            variant_cate_estimates = tau_hat[:, treatment_variant - 1, cate_channel]
+            if is_oos:
+                variant_cate_estimates[:] = np.reshape(
+                    self.predict_treatment(
+                        X,
+                        is_oos=is_oos,
+                        oos_method=oos_method,
+                        model_kind=TREATMENT_MODEL,
+                        model_ord=treatment_variant - 1,
+                    ),
+                    -1,
+                )
+            else:
+                variant_indices = self._variants_indices[treatment_variant - 1]
+                variant_cate_estimates[variant_indices] = np.reshape(
+                    self.predict_treatment(
+                        index_matrix(X, variant_indices),
+                        is_oos=False,
+                        model_kind=TREATMENT_MODEL,
+                        model_ord=treatment_variant - 1,
+                    ),
+                    -1,
                 )
+                if not variant_indices.all():
+                    variant_cate_estimates[~variant_indices] = np.reshape(
+                        self.predict_treatment(
+                            index_matrix(X, ~variant_indices),
+                            is_oos=True,
+                            oos_method=oos_method,
+                            model_kind=TREATMENT_MODEL,
+                            model_ord=treatment_variant - 1,
+                        ),
+                        -1,
+                    )
             if self.is_classification:
                 # This is to be consistent with other MetaLearners (e.g. S and T) that automatically
                 # work with multiclass outcomes and return the CATE estimate for each class. As the R-Learner only
                 # works with binary classes (the pseudo outcome formula does not make sense with
                 # multiple classes unless some adaptation is done) we can manually infer the
                 # CATE estimate for the complementary class  -- returning a matrix of shape (N, 2).
-                variant_estimates = np.stack(
-                    [-variant_estimates, variant_estimates], axis=-1
-                )
-                if sum(~variant_indices) > 0:
-                    non_variant_estimates = np.stack(
-                        [-non_variant_estimates, non_variant_estimates], axis=-1
-                    )
-            variant_estimates = variant_estimates.reshape(
-                (sum(variant_indices), n_outputs)
-            )
-            if sum(~variant_indices) > 0:
-                non_variant_estimates = non_variant_estimates.reshape(
-                    (sum(~variant_indices), n_outputs)
+                np.negative(
+                    variant_cate_estimates, out=tau_hat[:, treatment_variant - 1, 0]
                 )
-                tau_hat[~variant_indices, treatment_variant - 1] = non_variant_estimates
-
-            tau_hat[variant_indices, treatment_variant - 1] = variant_estimates
         return tau_hat
 
     @copydoc(MetaLearner.evaluate, sep="\n\t")
@@ -387,23 +384,8 @@ class RLearner(MetaLearner):
         )
 
         # TODO: improve this? generalize it to other metalearners?
-        w_hat = self.predict_nuisance(
-            X=X,
-            is_oos=is_oos,
-            oos_method=oos_method,
-            model_kind=PROPENSITY_MODEL,
-            model_ord=0,
-        )
-
-        y_hat = self.predict_nuisance(
-            X=X,
-            is_oos=is_oos,
-            oos_method=oos_method,
-            model_kind=OUTCOME_MODEL,
-            model_ord=0,
-        )
-        if self.is_classification:
-            y_hat = y_hat[:, 1]
+        # The nuisance estimates are shared by the pseudo outcomes and the R-loss.
+        y_hat, w_hat = self._nuisance_estimates(X, is_oos=is_oos, oos_method=oos_method)
 
         pseudo_outcome: list[np.ndarray] = []
         sample_weights: list[np.ndarray] = []
@@ -420,6 +402,8 @@ class RLearner(MetaLearner):
                 is_oos=is_oos,
                 oos_method=oos_method,
                 mask=mask,
+                y_estimates=y_hat,
+                w_estimates=w_hat,
             )
             pseudo_outcome.append(tv_pseudo_outcome)
             sample_weights.append(tv_sample_weights)
@@ -440,10 +424,12 @@ class RLearner(MetaLearner):
 
         rloss_evaluation = {}
         tau_hat = self.predict(X=X, is_oos=is_oos, oos_method=oos_method)
-        is_control = w == 0
+        # Only numpy arrays are passed to r_loss such that their validation reduces to
+        # comparing lengths.
+        y_array = np.asarray(y)
+        w_array = np.asarray(w)
         for treatment_variant in range(1, self.n_variants):
-            is_treatment = w == treatment_variant
-            mask = is_treatment | is_control
+            mask = np.asarray(masks[treatment_variant - 1])
 
             propensity_estimates = w_hat[:, treatment_variant] / (
                 w_hat[:, 0] + w_hat[:, treatment_variant]
@@ -457,8 +443,8 @@ class RLearner(MetaLearner):
                 cate_estimates=cate_estimates[mask],
                 outcome_estimates=y_hat[mask],
                 propensity_scores=propensity_estimates[mask],
-                outcomes=y[mask],
-                treatments=w[mask] == treatment_variant,
+                outcomes=y_array[mask],
+                treatments=w_array[mask] == treatment_variant,
             )
         return (
             propensity_evaluation
@@ -467,6 +453,32 @@ class RLearner(MetaLearner):
             | treatment_evaluation
         )
 
+    def _nuisance_estimates(
+        self, X: Matrix, is_oos: bool, oos_method: OosMethod = OVERALL
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Predict the outcome and the propensity estimates for all of ``X``.
+
+        In case of a classification outcome, only the probability of the positive
+        class is returned as the outcome estimate.
+        """
+        y_estimates = self.predict_nuisance(
+            X=X,
+            is_oos=is_oos,
+            model_kind=OUTCOME_MODEL,
+            model_ord=0,
+            oos_method=oos_method,
+        )
+        w_estimates = self.predict_nuisance(
+            X=X,
+            is_oos=is_oos,
+            model_kind=PROPENSITY_MODEL,
+            model_ord=0,
+            oos_method=oos_method,
+        )
+        if self.is_classification:
+            y_estimates = y_estimates[:, 1]
+        return y_estimates, w_estimates
+
     def _pseudo_outcome_and_weights(
         self,
         X: Matrix,
@@ -477,6 +489,8 @@ class RLearner(MetaLearner):
         oos_method: OosMethod = OVERALL,
         mask: Vector | None = None,
         epsilon: float = _EPSILON,
+        y_estimates: np.ndarray | None = None,
+        w_estimates: np.ndarray | None = None,
     ) -> tuple[np.ndarray, np.ndarray]:
         """Compute the R-Learner pseudo outcome and corresponding weights.
 
@@ -485,6 +499,13 @@ class RLearner(MetaLearner):
 
         Since the pseudo outcome is a fraction of residuals, we add a small
         constant ``epsilon`` to the denominator in order to avoid numerical problems.
+
+        The pseudo outcomes and weights are of type ``np.float32`` if ``X`` is an array
+        of type ``np.float32`` and of type ``np.float64`` otherwise.
+
+        ``y_estimates`` and ``w_estimates`` can be passed as returned by
+        :meth:`~metalearners.rlearner.RLearner._nuisance_estimates` for all of ``X``,
+        in which case they are not predicted again.
         """
         if mask is None:
             mask = np.ones(safe_len(X), dtype=bool)
@@ -493,37 +514,36 @@ class RLearner(MetaLearner):
 
         # Note that if we already applied the mask as an input to this call, we wouldn't
         # be able to match original observations with their corresponding folds.
-        y_estimates = self.predict_nuisance(
-            X=X,
-            is_oos=is_oos,
-            model_kind=OUTCOME_MODEL,
-            model_ord=0,
-            oos_method=oos_method,
-        )[mask]
-        w_estimates = self.predict_nuisance(
-            X=X,
-            is_oos=is_oos,
-            model_kind=PROPENSITY_MODEL,
-            model_ord=0,
-            oos_method=oos_method,
-        )[mask]
-        w_estimates_binarized = w_estimates[:, treatment_variant] / (
-            w_estimates[:, 0] + w_estimates[:, treatment_variant]
-        )
-
-        if self.is_classification:
-            y_estimates = y_estimates[:, 1]
-
-        y_residuals = y[mask] - y_estimates
+        if y_estimates is None or w_estimates is None:
+            y_estimates, w_estimates = self._nuisance_estimates(
+                X, is_oos=is_oos, oos_method=oos_method
+            )
 
-        w_binarized = w[mask] == treatment_variant
-        w_residuals = w_binarized - w_estimates_binarized
-        w_residuals_padded = clip_element_absolute_value_to_epsilon(
-            w_residuals, epsilon
+        # Features in single precision indicate that the pseudo outcomes and weights
+        # don't require double precision either.
+        dtype = np.float32 if getattr(X, "dtype", None) == np.float32 else np.float64
+
+        # Only the required columns are masked. Since masking copies, the resulting
+        # arrays are owned by this method and the residuals can be computed in place
+        # instead of allocating a new array for every intermediate result.
+        y_residuals = y_estimates[mask].astype(dtype, copy=False)
+        w_residuals = w_estimates[mask, treatment_variant].astype(dtype, copy=False)
+        w_estimates_normalization = w_estimates[mask, 0].astype(dtype, copy=False)
+        np.add(w_estimates_normalization, w_residuals, out=w_estimates_normalization)
+        np.divide(w_residuals, w_estimates_normalization, out=w_residuals)
+
+        np.subtract(np.asarray(y)[mask], y_residuals, out=y_residuals)
+        np.subtract(
+            np.asarray(w)[mask] == treatment_variant, w_residuals, out=w_residuals
         )
 
-        pseudo_outcomes = y_residuals / w_residuals_padded
-        weights = np.square(w_residuals)
+        pseudo_outcomes = np.divide(
+            y_residuals,
+            clip_element_absolute_value_to_epsilon(w_residuals, epsilon),
+            out=y_residuals,
+        )
+        # The residuals are not needed beyond this point and are hence squared in place.
+        weights = np.square(w_residuals, out=w_residuals)
 
         return pseudo_outcomes, weights
 
@@ -71,19 +71,17 @@ class TLearner(_ConditionalAverageOutcomeMetaLearner):
         self._validate_treatment(w)
         self._validate_outcome(y, w)
 
-        self._treatment_variants_mask = []
-
-        for v in range(self.n_variants):
-            self._treatment_variants_mask.append(w == v)
+        self._set_treatment_variants(w)
 
         qualified_fit_params = self._qualified_fit_params(fit_params)
 
         nuisance_jobs: list[_ParallelJoblibSpecification | None] = []
         for treatment_variant in range(self.n_variants):
+            mask = self._treatment_variant_mask(treatment_variant)
             nuisance_jobs.append(
                 self._nuisance_joblib_specifications(
-                    X=index_matrix(X, self._treatment_variants_mask[treatment_variant]),
-                    y=y[self._treatment_variants_mask[treatment_variant]],
+                    X=index_matrix(X, mask),
+                    y=y[mask],
                     model_kind=VARIANT_OUTCOME_MODEL,
                     model_ord=treatment_variant,
                     n_jobs_cross_fitting=n_jobs_cross_fitting,
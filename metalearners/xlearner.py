@@ -96,28 +96,27 @@ class XLearner(_ConditionalAverageOutcomeMetaLearner):
         self._validate_treatment(w)
         self._validate_outcome(y, w)
 
-        self._treatment_variants_mask = []
+        treatment_variants = self._set_treatment_variants(w)
 
         qualified_fit_params = self._qualified_fit_params(fit_params)
 
         self._cvs: list = []
 
+        variant_counts = np.bincount(treatment_variants, minlength=self.n_variants)
         for treatment_variant in range(self.n_variants):
-            self._treatment_variants_mask.append(w == treatment_variant)
             if synchronize_cross_fitting:
-                cv_split_indices = self._split(
-                    index_matrix(X, self._treatment_variants_mask[treatment_variant])
-                )
+                cv_split_indices = self._split(variant_counts[treatment_variant])
             else:
                 cv_split_indices = None
             self._cvs.append(cv_split_indices)
 
         nuisance_jobs: list[_ParallelJoblibSpecification | None] = []
         for treatment_variant in range(self.n_variants):
+            mask = self._treatment_variant_mask(treatment_variant)
             nuisance_jobs.append(
                 self._nuisance_joblib_specifications(
-                    X=index_matrix(X, self._treatment_variants_mask[treatment_variant]),
-                    y=y[self._treatment_variants_mask[treatment_variant]],
+                    X=index_matrix(X, mask),
+                    y=y[mask],
                     model_kind=VARIANT_OUTCOME_MODEL,
                     model_ord=treatment_variant,
                     n_jobs_cross_fitting=n_jobs_cross_fitting,
@@ -157,10 +156,10 @@ class XLearner(_ConditionalAverageOutcomeMetaLearner):
         synchronize_cross_fitting: bool = True,
         n_jobs_base_learners: int | None = None,
     ) -> Self:
-        if self._treatment_variants_mask is None:
+        if self._treatment_variants is None:
             raise ValueError(
                 "The nuisance models need to be fitted before fitting the treatment models."
-                "In particular, the MetaLearner's attribute _treatment_variant_mask, "
+                "In particular, the MetaLearner's attribute _treatment_variants, "
                 "typically set during nuisance fitting, is None."
             )
         if not hasattr(self, "_cvs"):
@@ -177,16 +176,18 @@ class XLearner(_ConditionalAverageOutcomeMetaLearner):
             self.predict_conditional_average_outcomes(
                 X=X,
                 is_oos=False,
+                n_jobs_base_learners=n_jobs_base_learners,
             )
         )
 
+        X_control = index_matrix(X, self._treatment_variant_mask(0))
         for treatment_variant in range(1, self.n_variants):
             imputed_te_control, imputed_te_treatment = self._pseudo_outcome(
                 y, w, treatment_variant, conditional_average_outcome_estimates
             )
             treatment_jobs.append(
                 self._treatment_joblib_specifications(
-                    X=index_matrix(X, self._treatment_variants_mask[treatment_variant]),
+                    X=index_matrix(X, self._treatment_variant_mask(treatment_variant)),
                     y=imputed_te_treatment,
                     model_kind=TREATMENT_EFFECT_MODEL,
                     model_ord=treatment_variant - 1,
@@ -198,7 +199,7 @@ class XLearner(_ConditionalAverageOutcomeMetaLearner):
 
             treatment_jobs.append(
                 self._treatment_joblib_specifications(
-                    X=index_matrix(X, self._treatment_variants_mask[0]),
+                    X=X_control,
                     y=imputed_te_control,
                     model_kind=CONTROL_EFFECT_MODEL,
                     model_ord=treatment_variant - 1,
@@ -221,10 +222,10 @@ class XLearner(_ConditionalAverageOutcomeMetaLearner):
         is_oos: bool,
         oos_method: OosMethod = OVERALL,
     ) -> np.ndarray:
-        if self._treatment_variants_mask is None:
+        if self._treatment_variants is None:
             raise ValueError(
                 "The MetaLearner needs to be fitted before predicting. "
-                "In particular, the X-Learner's attribute _treatment_variant_mask, "
+                "In particular, the X-Learner's attribute _treatment_variants, "
                 "typically set during fitting, is None."
             )
         n_outputs = 2 if self.is_classification else 1
@@ -239,11 +240,11 @@ class XLearner(_ConditionalAverageOutcomeMetaLearner):
             oos_method=propensity_score_oos,
         )
 
-        control_indices = self._treatment_variants_mask[0]
+        control_indices = self._treatment_variant_mask(0)
         non_control_indices = ~control_indices
 
         for treatment_variant in range(1, self.n_variants):
-            treatment_variant_mask = self._treatment_variants_mask[treatment_variant]
+            treatment_variant_mask = self._treatment_variant_mask(treatment_variant)
             non_treatment_variant_mask = ~treatment_variant_mask
             if is_oos:
                 tau_hat_treatment = self.predict_treatment(
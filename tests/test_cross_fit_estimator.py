@@ -1,10 +1,14 @@
 # Copyright (c) QuantCo 2024-2024
 # SPDX-License-Identifier: BSD-3-Clause
 
+import tracemalloc
 from functools import partial
 
 import numpy as np
+import pandas as pd
 import pytest
+from joblib import effective_n_jobs, parallel_backend
+from joblib.parallel import get_active_backend
 from lightgbm import LGBMClassifier, LGBMRegressor
 from scipy.sparse import csr_matrix
 from sklearn.base import is_classifier, is_regressor
@@ -12,9 +16,13 @@ from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.metrics import accuracy_score, log_loss
 from sklearn.model_selection import KFold
 
+from metalearners import cross_fit_estimator
 from metalearners.cross_fit_estimator import (
     CrossFitEstimator,
+    _cross_fitting_backend,
+    _index_fit_params,
     _PredictContext,
+    _reshape_fold_prediction,
     _validate_data_match_prior_split,
 )
 
@@ -173,6 +181,74 @@ def test_fit_params(mindset_data):
     cfe.fit(X=df[feature_columns], y=df[outcome_column], fit_params={"key": "val"})
 
 
+@pytest.mark.parametrize("enable_overall", [True, False])
+def test_fit_params_sliced(enable_overall, rng):
+    n_samples = 100
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+    sample_weight = rng.uniform(size=n_samples)
+
+    cfe = CrossFitEstimator(
+        n_folds=5,
+        estimator_factory=LinearRegression,
+        enable_overall=enable_overall,
+        random_state=_SEED,
+    )
+    cfe.fit(X=X, y=y, fit_params={"sample_weight": sample_weight})
+
+    assert cfe._test_indices is not None
+    for estimator, test_indices in zip(cfe._estimators, cfe._test_indices):
+        train_indices = np.setdiff1d(np.arange(n_samples), test_indices)
+        expected = LinearRegression().fit(
+            X[train_indices], y[train_indices], sample_weight[train_indices]
+        )
+        np.testing.assert_allclose(estimator.coef_, expected.coef_)  # type: ignore
+    if enable_overall:
+        expected = LinearRegression().fit(X, y, sample_weight)
+        np.testing.assert_allclose(
+            cfe._overall_estimator.coef_, expected.coef_  # type: ignore
+        )
+    else:
+        assert cfe._overall_estimator is None
+
+
+def test_index_fit_params(rng):
+    n_samples = 10
+    rows = np.array([1, 3, 4])
+    sample_weight = rng.uniform(size=n_samples)
+    fit_params = {
+        "sample_weight": pd.Series(sample_weight),
+        "groups": list(range(n_samples)),
+        "feature_weights": np.ones(3),
+        "categorical_feature": "auto",
+        "eval_set": [(np.ones((2, 3)), np.ones(2))],
+    }
+    result = _index_fit_params(fit_params, n_samples, rows)
+    np.testing.assert_allclose(result["sample_weight"], sample_weight[rows])
+    np.testing.assert_array_equal(result["groups"], rows)
+    assert result["feature_weights"] is fit_params["feature_weights"]
+    assert result["categorical_feature"] == "auto"
+    assert result["eval_set"] is fit_params["eval_set"]
+
+
+def test_crossfitestimator_unsorted_cv(rng):
+    n_samples = 100
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+    cv = list(KFold(n_splits=5, shuffle=True, random_state=_SEED).split(X))
+    unsorted_cv = [(train, rng.permutation(test)) for train, test in cv]
+
+    cfe = CrossFitEstimator(5, LinearRegression).fit(X, y, cv=unsorted_cv)
+    assert cfe._test_indices is not None
+    for test_indices in cfe._test_indices:
+        assert np.all(np.diff(test_indices) > 0)
+
+    expected = np.empty(n_samples)
+    for estimator, (_, test_indices) in zip(cfe._estimators, cv):
+        expected[test_indices] = estimator.predict(X[test_indices])
+    np.testing.assert_allclose(cfe.predict(X, is_oos=False), expected)
+
+
 def test_predict_context(rng):
     model = CrossFitEstimator(10, LogisticRegression)
     n_train_obs = 1000
@@ -284,3 +360,198 @@ def test_score_smoke(estimator, rng):
     cfe = CrossFitEstimator(5, estimator, {"n_estimators": 3})
     cfe.fit(X, y)
     cfe.score(X, y, False)
+
+
+@pytest.mark.parametrize("n_jobs", [None, 1, 2])
+def test_crossfitestimator_n_jobs(n_jobs, rng):
+    n_samples = 1000
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+
+    cfe = CrossFitEstimator(5, LinearRegression, n_jobs=n_jobs, random_state=_SEED)
+    assert cfe.clone().n_jobs == n_jobs
+    cfe.fit(X, y)
+
+    reference = CrossFitEstimator(5, LinearRegression, random_state=_SEED).fit(X, y)
+    np.testing.assert_allclose(
+        cfe.predict(X, is_oos=False), reference.predict(X, is_oos=False)
+    )
+    np.testing.assert_allclose(
+        cfe.predict(X, is_oos=True, oos_method="overall"),
+        reference.predict(X, is_oos=True, oos_method="overall"),
+    )
+
+
+def test_crossfitestimator_fit_peak_memory(rng):
+    n_samples = 20_000
+    X = rng.standard_normal((n_samples, 25))
+    y = rng.standard_normal(n_samples)
+    cfe = CrossFitEstimator(10, LinearRegression)
+
+    tracemalloc.start()
+    try:
+        cfe.fit(X, y, fit_params={"sample_weight": np.ones(n_samples)})
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The training data of the folds is only materialized when the respective fold
+    # is fitted, rather than for all folds up front.
+    assert peak < 4 * X.nbytes
+
+
+@pytest.mark.parametrize(
+    "is_oos, oos_method", [(True, "mean"), (True, "median"), (False, None)]
+)
+def test_crossfitestimator_predict_n_jobs(is_oos, oos_method, rng):
+    n_samples = 1000
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+
+    cfe = CrossFitEstimator(5, LinearRegression, random_state=_SEED).fit(X, y)
+    expected = cfe.predict(X, is_oos=is_oos, oos_method=oos_method)
+    cfe.n_jobs = 2
+    np.testing.assert_allclose(
+        cfe.predict(X, is_oos=is_oos, oos_method=oos_method), expected
+    )
+
+
+@pytest.mark.parametrize(
+    "estimator_factory, method",
+    [(LinearRegression, "predict"), (LogisticRegression, "predict_proba")],
+)
+def test_crossfitestimator_predict_mean(estimator_factory, method, rng):
+    n_samples = 1000
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.integers(0, 3, n_samples)
+
+    cfe = CrossFitEstimator(5, estimator_factory, random_state=_SEED).fit(X, y)
+    np.testing.assert_allclose(
+        cfe._predict_mean(X, method),
+        np.mean(cfe._predict_all(X, method), axis=-1),
+    )
+
+
+@pytest.mark.parametrize(
+    "estimator_factory, method, oos_method",
+    [
+        (LinearRegression, "predict", "mean"),
+        (LinearRegression, "predict", "median"),
+        (LogisticRegression, "predict_proba", "mean"),
+    ],
+)
+@pytest.mark.parametrize("backend", ["np", "pd", "csr"])
+def test_crossfitestimator_predict_blocks(
+    estimator_factory, method, oos_method, backend, rng, monkeypatch
+):
+    n_samples = 1000
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.integers(0, 3, n_samples)
+    if backend == "pd":
+        X = pd.DataFrame(X)
+    elif backend == "csr":
+        X = csr_matrix(X)
+
+    cfe = CrossFitEstimator(5, estimator_factory, random_state=_SEED).fit(X, y)
+    expected = getattr(cfe, method)(X, is_oos=True, oos_method=oos_method)
+    monkeypatch.setattr(cross_fit_estimator, "_PREDICTION_BLOCK_SIZE", 64)
+    np.testing.assert_allclose(
+        getattr(cfe, method)(X, is_oos=True, oos_method=oos_method), expected
+    )
+
+
+@pytest.mark.parametrize(
+    "is_oos, oos_method", [(False, None), (True, "mean"), (True, "median")]
+)
+def test_crossfitestimator_dtype(is_oos, oos_method, rng):
+    n_samples = 100
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+
+    cfe = CrossFitEstimator(5, LinearRegression, random_state=_SEED).fit(X, y)
+    expected = cfe.predict(X, is_oos=is_oos, oos_method=oos_method)
+    cfe.dtype = np.float32
+    assert cfe.clone().dtype == np.float32
+    predictions = cfe.predict(X, is_oos=is_oos, oos_method=oos_method)
+    assert predictions.dtype == np.float32
+    np.testing.assert_allclose(predictions, expected, rtol=1e-5, atol=1e-5)
+
+
+class _CountingRegression(LinearRegression):
+    """Linear regression counting its calls to ``predict`` and ``score``.
+
+    The count is shared across all instances, i.e. across the estimators of all folds.
+    """
+
+    n_calls = 0
+
+    def predict(self, X):
+        type(self).n_calls += 1
+        return super().predict(X)
+
+    def score(self, X, y, sample_weight=None):
+        type(self).n_calls += 1
+        return super().score(X, y, sample_weight)
+
+
+@pytest.fixture
+def counting_regression(monkeypatch):
+    monkeypatch.setattr(_CountingRegression, "n_calls", 0)
+    return _CountingRegression
+
+
+def test_predict_context_memoizes_predictions(counting_regression, rng):
+    n_samples = 100
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+    model = CrossFitEstimator(5, counting_regression).fit(X, y)
+
+    with _PredictContext(model, True, "mean") as modified_model:
+        first_predictions = modified_model.predict(X)
+        second_predictions = modified_model.predict(X)
+    assert counting_regression.n_calls == 5
+    np.testing.assert_array_equal(first_predictions, second_predictions)
+
+    model.predict(X, True, "mean")
+    assert counting_regression.n_calls == 10
+
+
+def test_crossfitestimator_fit_does_not_predict(counting_regression, rng):
+    n_samples = 100
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+    CrossFitEstimator(5, counting_regression).fit(X, y)
+    assert counting_regression.n_calls == 0
+
+
+def test_reshape_fold_prediction(rng):
+    vector = rng.standard_normal(10)
+    reshaped_vector = _reshape_fold_prediction(vector, 10, 1)
+    assert reshaped_vector.shape == (10, 1)
+    assert np.shares_memory(reshaped_vector, vector)
+
+    fortran_matrix = np.asfortranarray(rng.standard_normal((10, 3)))
+    assert _reshape_fold_prediction(fortran_matrix, 10, 3) is fortran_matrix
+
+
+@pytest.mark.parametrize("n_jobs, expected", [(None, None), (1, None), (2, 1)])
+def test_cross_fitting_backend(n_jobs, expected):
+    with _cross_fitting_backend(n_jobs):
+        backend, _ = get_active_backend()
+        assert backend.inner_max_num_threads == expected
+
+
+def test_cross_fitting_backend_user_backend():
+    with parallel_backend("loky", inner_max_num_threads=2):
+        with _cross_fitting_backend(2):
+            backend, _ = get_active_backend()
+            assert backend.inner_max_num_threads == 2
+    with parallel_backend("threading"):
+        with _cross_fitting_backend(2):
+            backend, _ = get_active_backend()
+            assert backend.inner_max_num_threads is None
+    with parallel_backend("loky", n_jobs=4):
+        with _cross_fitting_backend(None):
+            backend, n_jobs = get_active_backend()
+            assert backend.inner_max_num_threads == 1
+            assert n_jobs == 4
+            assert effective_n_jobs(None) == 4
@@ -677,6 +677,30 @@ def test_validate_treatment_error_encoding(metalearner_prefix):
         learner.fit(covariates, y, w)
 
 
+@pytest.mark.parametrize("metalearner_prefix", ["S", "T", "X", "R", "DR"])
+@pytest.mark.parametrize(
+    "w", [np.array([0, 1] * 5), np.array([0, 1, 3] * 4), np.array([-1, 0, 1] * 4)]
+)
+def test_validate_treatment_error_missing_variant(metalearner_prefix, w):
+    covariates = np.zeros((len(w), 1))
+    y = np.zeros(len(w))
+
+    factory = metalearner_factory(metalearner_prefix)
+    if not factory._supports_multi_treatment():
+        pytest.skip()
+    learner = factory(
+        nuisance_model_factory=LinearRegression,
+        is_classification=False,
+        n_variants=3,
+        treatment_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        n_folds=2,
+    )
+
+    with pytest.raises(ValueError, match="Number of variants|should be encoded"):
+        learner.fit(covariates, y, w)
+
+
 @pytest.mark.parametrize("metalearner_prefix", ["S", "T", "X", "R", "DR"])
 def test_validate_treatment_error_different_instantiation(metalearner_prefix):
     covariates = np.zeros((10, 1))
@@ -880,10 +904,10 @@ def test_model_reusage(outcome_kind, request):
             VARIANT_OUTCOME_MODEL: tlearner._nuisance_models[VARIANT_OUTCOME_MODEL]
         },
     )
-    # We need to manually copy _treatment_variants_mask for the xlearner as it's needed
+    # We need to manually copy _treatment_variants for the xlearner as it's needed
     # for predict, the user should not have to do this as they should call fit before predict.
     # This is just for testing.
-    xlearner._treatment_variants_mask = tlearner._treatment_variants_mask
+    xlearner._treatment_variants = tlearner._treatment_variants
     np.testing.assert_allclose(
         tlearner.predict_conditional_average_outcomes(covariates, False),
         xlearner.predict_conditional_average_outcomes(covariates, False),
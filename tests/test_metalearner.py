@@ -8,6 +8,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import pytest
+from joblib import parallel_backend
 from lightgbm import LGBMClassifier, LGBMRegressor
 from scipy.sparse import csr_matrix
 from shap import TreeExplainer, summary_plot
@@ -514,6 +515,31 @@ def test_feature_set(feature_set, expected_n_features, backend, rng):
             assert m._overall_estimator.n_features_ == exp  # type: ignore
 
 
+def test_model_reusage_refit(rng):
+    X = rng.standard_normal((100, 3))
+    y = rng.standard_normal(100)
+    w = rng.integers(0, 2, 100)
+    factory_kwargs = dict(
+        nuisance_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        treatment_model_factory=LinearRegression,
+        is_classification=False,
+        n_variants=2,
+        n_folds=2,
+    )
+    ml = TLearner(**factory_kwargs).fit(X, y, w)
+    prefitted_models = ml._nuisance_models[VARIANT_OUTCOME_MODEL]
+    coefs = [cfe._overall_estimator.coef_.copy() for cfe in prefitted_models]  # type: ignore
+    ml_reuse = TLearner(
+        **factory_kwargs,
+        fitted_nuisance_models={VARIANT_OUTCOME_MODEL: prefitted_models},
+    )
+
+    ml.fit_nuisance(X, rng.standard_normal(100), VARIANT_OUTCOME_MODEL, 0)
+    for cfe, coef in zip(ml_reuse._nuisance_models[VARIANT_OUTCOME_MODEL], coefs):
+        np.testing.assert_array_equal(cfe._overall_estimator.coef_, coef)  # type: ignore
+
+
 def test_model_reusage_init():
     # TODO: Split up into several tests.
     prefitted_models = [CrossFitEstimator(10, LGBMRegressor)]
@@ -526,6 +552,8 @@ def test_model_reusage_init():
     )
     assert ml._nuisance_models["nuisance1"][0].estimator_factory == LGBMRegressor
     assert ml._nuisance_models["nuisance2"][0].estimator_factory == LinearRegression
+    assert ml._nuisance_models["nuisance1"][0] is prefitted_models[0]
+    assert ml._nuisance_models["nuisance1"] is not prefitted_models
     with pytest.raises(ValueError, match="A model for the nuisance model nuisance2"):
         _TestMetaLearner(
             is_classification=False,
@@ -1024,6 +1052,36 @@ def test_synchronization_smoke(
     ml.fit(X=X, y=y, w=w, synchronize_cross_fitting=synchronize_cross_fitting)
 
 
+def test_synchronization_shared_folds(rng):
+    sample_size = 100
+    n_features = 2
+
+    X = rng.standard_normal((sample_size, n_features))
+    y = rng.standard_normal(sample_size)
+    w = rng.integers(0, 2, sample_size)
+
+    ml = RLearner(
+        is_classification=False,
+        n_variants=2,
+        nuisance_model_factory=LinearRegression,
+        treatment_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        random_state=42,
+    )
+    ml.fit_all_nuisance(X=X, y=y, w=w, synchronize_cross_fitting=True)
+
+    test_indices = []
+    for cfes in ml._nuisance_models.values():
+        for cfe in cfes:
+            assert cfe._test_indices is not None
+            test_indices.append(cfe._test_indices)
+    for other_test_indices in test_indices[1:]:
+        for fold_indices, other_fold_indices in zip(
+            test_indices[0], other_test_indices
+        ):
+            np.testing.assert_array_equal(fold_indices, other_fold_indices)
+
+
 @pytest.mark.parametrize(
     "n_folds,success",
     [
@@ -1077,6 +1135,64 @@ def test_n_jobs_base_learners(implementation, rng):
     np.testing.assert_allclose(ml.predict(X, True), ml_2.predict(X, True))
 
 
+@pytest.mark.parametrize("implementation", [TLearner, XLearner, DRLearner])
+@pytest.mark.parametrize("is_oos", [False, True])
+def test_predict_conditional_average_outcomes_n_jobs_base_learners(
+    implementation, is_oos, rng
+):
+    n_variants = 5
+    X = rng.standard_normal((1000, 10))
+    y = rng.standard_normal(1000)
+    w = rng.integers(0, n_variants, 1000)
+
+    ml = implementation(
+        is_classification=False,
+        n_variants=n_variants,
+        nuisance_model_factory=LinearRegression,
+        treatment_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        random_state=_SEED,
+    )
+    ml.fit(X, y, w)
+
+    np.testing.assert_allclose(
+        ml.predict_conditional_average_outcomes(X, is_oos, n_jobs_base_learners=-1),
+        ml.predict_conditional_average_outcomes(X, is_oos),
+    )
+
+
+@pytest.mark.parametrize("implementation", [TLearner, XLearner, DRLearner])
+def test_predict_conditional_average_outcomes_n_jobs_base_learners_process_backend(
+    implementation, rng
+):
+    n_variants = 3
+    X = rng.standard_normal((1000, 10))
+    y = rng.standard_normal(1000)
+    w = rng.integers(0, n_variants, 1000)
+    factory_kwargs = dict(
+        is_classification=False,
+        n_variants=n_variants,
+        nuisance_model_factory=LinearRegression,
+        treatment_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        random_state=_SEED,
+    )
+    ml = implementation(**factory_kwargs).fit(X, y, w)
+    expected = ml.predict_conditional_average_outcomes(X, True)
+
+    # A process-based backend chosen by the user must not lead to the predictions of
+    # the variants being written in worker processes.
+    with parallel_backend("loky"):
+        np.testing.assert_allclose(
+            ml.predict_conditional_average_outcomes(X, True, n_jobs_base_learners=2),
+            expected,
+        )
+        ml_parallel = implementation(**factory_kwargs).fit(
+            X, y, w, n_jobs_base_learners=2
+        )
+    np.testing.assert_allclose(ml_parallel.predict(X, True), ml.predict(X, True))
+
+
 @pytest.mark.parametrize(
     "implementation",
     [TLearner, SLearner, XLearner, RLearner, DRLearner],
@@ -1153,3 +1269,31 @@ def test_init_args(implementation):
     assert set(ml.__dict__.keys()) == set(ml2.__dict__.keys())
     for key in ml.__dict__:
         assert ml.__dict__[key] == ml2.__dict__[key]
+
+
+def test_evaluate_key_order(rng):
+    n_variants = 3
+    sample_size = 200
+    X = rng.standard_normal((sample_size, 2))
+    y = rng.standard_normal(sample_size)
+    w = rng.integers(0, n_variants, sample_size)
+
+    ml = TLearner(
+        is_classification=False,
+        n_variants=n_variants,
+        nuisance_model_factory=LinearRegression,
+        n_folds=2,
+    )
+    ml.fit(X, y, w)
+    evaluation = ml.evaluate(
+        X,
+        y,
+        w,
+        is_oos=False,
+        scoring={"variant_outcome_model": ["r2", "neg_mean_squared_error"]},
+    )
+    assert list(evaluation.keys()) == [
+        f"variant_outcome_model_{tv}_{scorer}"
+        for scorer in ["r2", "neg_mean_squared_error"]
+        for tv in range(n_variants)
+    ]
@@ -41,6 +41,84 @@ def test_r_loss(use_pandas):
     assert result == pytest.approx(2, abs=1e-4, rel=1e-4)
 
 
+def test_r_loss_inconsistent_inputs():
+    kwargs = {
+        "cate_estimates": np.array([2, 2]),
+        "outcomes": np.array([6.1, 6.1]),
+        "outcome_estimates": np.array([3.1, 3.1]),
+        "treatments": np.array([1, 1]),
+        "propensity_scores": np.array([0.5, 0.5]),
+    }
+    with pytest.raises(ValueError, match="same length"):
+        r_loss(**(kwargs | {"outcomes": np.array([6.1, 6.1, 6.1])}))
+    with pytest.raises(ValueError, match="index of 0 to n-1"):
+        r_loss(**(kwargs | {"outcomes": pd.Series([6.1, 6.1], index=[1, 2])}))
+
+
+def test_rlearner_nuisance_predicted_once(monkeypatch, rng):
+    n_samples = 200
+    n_variants = 4
+    X = rng.standard_normal((n_samples, 3))
+    y = rng.standard_normal(n_samples)
+    w = rng.integers(0, n_variants, n_samples)
+    ml = RLearner(
+        nuisance_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        treatment_model_factory=LinearRegression,
+        is_classification=False,
+        n_variants=n_variants,
+        n_folds=2,
+    )
+    ml.fit_all_nuisance(X, y, w)
+
+    n_calls = 0
+    original_predict_nuisance = ml.predict_nuisance
+
+    def predict_nuisance(*args, **kwargs):
+        nonlocal n_calls
+        n_calls += 1
+        return original_predict_nuisance(*args, **kwargs)
+
+    monkeypatch.setattr(ml, "predict_nuisance", predict_nuisance)
+    ml.fit_all_treatment(X, y, w)
+    # One call for each of the outcome and the propensity model, independently of
+    # the number of treatment variants.
+    assert n_calls == 2
+
+    n_calls = 0
+    ml.evaluate(X, y, w, is_oos=False)
+    assert n_calls == 2
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_rlearner_pseudo_outcome_dtype(dtype, rng):
+    n_samples = 200
+    X = rng.standard_normal((n_samples, 3)).astype(dtype)
+    y = rng.standard_normal(n_samples)
+    w = rng.integers(0, 2, n_samples)
+    ml = RLearner(
+        nuisance_model_factory=LinearRegression,
+        propensity_model_factory=LogisticRegression,
+        treatment_model_factory=LinearRegression,
+        is_classification=False,
+        n_variants=2,
+        n_folds=2,
+    )
+    ml.fit(X, y, w)
+    pseudo_outcomes, weights = ml._pseudo_outcome_and_weights(
+        X, y, w, treatment_variant=1, is_oos=False
+    )
+    assert pseudo_outcomes.dtype == dtype
+    assert weights.dtype == dtype
+    np.testing.assert_allclose(
+        pseudo_outcomes,
+        ml._pseudo_outcome_and_weights(
+            X.astype(np.float64), y, w, treatment_variant=1, is_oos=False
+        )[0],
+        rtol=1e-4,
+    )
+
+
 @pytest.mark.parametrize(
     "treatment_model_factory, onnx_converter",
     (